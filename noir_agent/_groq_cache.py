@@ -0,0 +1,64 @@
+"""Content-addressed cache for Groq chat completions."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from ._storage import CACHE_DIR, atomic_write
+
+LOGGER = logging.getLogger(__name__)
+
+MEMORY_ENTRIES = 128
+
+_GROQ_DIR = CACHE_DIR / "groq"
+_memory: "OrderedDict[str, str]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _cache_key(payload_bytes: bytes, schema_version: str) -> str:
+    return hashlib.blake2b(payload_bytes + schema_version.encode(), digest_size=16).hexdigest()
+
+
+def _remember(key: str, content: str) -> None:
+    with _lock:
+        _memory[key] = content
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def cached_chat(payload_bytes: bytes, schema_version: str) -> Optional[str]:
+    """Return the cached completion content for a request, or ``None`` on a miss."""
+
+    key = _cache_key(payload_bytes, schema_version)
+    with _lock:
+        content = _memory.get(key)
+        if content is not None:
+            _memory.move_to_end(key)
+            return content
+
+    try:
+        content = (_GROQ_DIR / f"{key}.json").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    except OSError as exc:
+        LOGGER.warning("Failed to read Groq cache entry %s: %s", key, exc)
+        return None
+
+    _remember(key, content)
+    return content
+
+
+def store_chat(payload_bytes: bytes, schema_version: str, content: str) -> None:
+    """Persist completion content for a request in memory and on disk."""
+
+    key = _cache_key(payload_bytes, schema_version)
+    _remember(key, content)
+    try:
+        atomic_write(_GROQ_DIR / f"{key}.json", content.encode("utf-8"))
+    except OSError as exc:
+        LOGGER.warning("Failed to write Groq cache entry %s: %s", key, exc)
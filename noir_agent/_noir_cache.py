@@ -0,0 +1,89 @@
+"""Disk cache for parsed Noir endpoints keyed by repository state."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import subprocess
+import time
+from typing import List, Optional
+
+import orjson
+
+from ._storage import CACHE_DIR, atomic_write
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_TTL_SECONDS = 24 * 60 * 60
+SKIP_DIRS = {".git"}
+
+_NOIR_DIR = CACHE_DIR / "noir"
+
+
+def cache_key(repo_path: str, base_url: str) -> str:
+    """Identify a Noir run by repository content and base URL."""
+
+    fingerprint = _git_fingerprint(repo_path) or _tree_fingerprint(repo_path)
+    url_digest = hashlib.blake2b(base_url.encode(), digest_size=8).hexdigest()
+    return f"{fingerprint}-{url_digest}"
+
+
+def cached_endpoints(key: str) -> Optional[List[dict]]:
+    """Return cached endpoint dicts for a key, or ``None`` when missing or stale."""
+
+    path = _NOIR_DIR / f"{key}.json"
+    try:
+        if time.time() - path.stat().st_mtime > CACHE_TTL_SECONDS:
+            return None
+        return orjson.loads(path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, orjson.JSONDecodeError) as exc:
+        LOGGER.warning("Ignoring unreadable Noir cache entry %s: %s", path, exc)
+        return None
+
+
+def store_endpoints(key: str, endpoints: List[dict]) -> None:
+    """Persist endpoint dicts for a key."""
+
+    try:
+        atomic_write(_NOIR_DIR / f"{key}.json", orjson.dumps(endpoints))
+    except OSError as exc:
+        LOGGER.warning("Failed to write Noir cache entry %s: %s", key, exc)
+
+
+def _git_fingerprint(repo_path: str) -> Optional[str]:
+    """Return HEAD plus the path inside the work tree, or ``None`` unless HEAD covers every file."""
+
+    def git(*args: str) -> str:
+        result = subprocess.run(["git", "-C", repo_path, *args], check=True, capture_output=True)
+        return result.stdout.decode("utf-8", "ignore").strip()
+
+    try:
+        head = git("rev-parse", "HEAD")
+        prefix = git("rev-parse", "--show-prefix")
+        # Uncommitted changes are not captured by HEAD, and neither are ignored files such
+        # as generated sources or an ignored scan root; fall back to the tree fingerprint.
+        if git("status", "--porcelain", "--ignored", "--", "."):
+            return None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return hashlib.blake2b(f"{head}:{prefix}".encode(), digest_size=16).hexdigest()
+
+
+def _tree_fingerprint(repo_path: str) -> str:
+    """Hash relative paths, sizes and modification times of every file in the tree."""
+
+    digest = hashlib.blake2b(digest_size=16)
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = sorted(name for name in dirs if name not in SKIP_DIRS)
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            relative = os.path.relpath(path, repo_path)
+            digest.update(f"{relative}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
@@ -0,0 +1,31 @@
+"""Filesystem helpers shared by the on-disk caches and the collection writer."""
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+# Only resolve the home directory when no cache dir is configured; containers without a
+# home directory would otherwise fail at import.
+_CACHE_DIR_ENV = os.getenv("NOIR_AGENT_CACHE_DIR")
+CACHE_DIR = Path(_CACHE_DIR_ENV) if _CACHE_DIR_ENV else Path.home() / ".cache" / "noir_agent"
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Write ``data`` to ``path`` so concurrent readers never see a partial file.
+
+    The bytes go to a temporary file in the same directory, which is then renamed over
+    the target; the temporary file is removed if anything fails before the rename.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per process and thread; unlike mkstemp, the file gets the usual umask mode.
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with tmp_path.open("wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
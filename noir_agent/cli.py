@@ -19,11 +19,12 @@ def generate(
     repo: str = typer.Option(..., "--repo", help="Repository path or git URL"),
     base_url: str = typer.Option(..., "--base-url", help="Base URL of the API"),
     out: Path = typer.Option("postman_collection.json", "--out", help="Output Postman file"),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore cached Noir and Groq results"),
 ):
     """Generate a Postman collection from the provided repository."""
 
     try:
-        run_pipeline(repo, base_url, str(out))
+        run_pipeline(repo, base_url, str(out), refresh=refresh)
     except Exception as exc:  # pylint: disable=broad-except
         logging.exception("Pipeline failed")
         raise typer.Exit(code=1) from exc
@@ -2,16 +2,25 @@
 
 from __future__ import annotations
 
+import itertools
 import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 
 LOGGER = logging.getLogger(__name__)
 
 ROUTE_HINTS = {"route", "router", "controller", "urls", "views", "api"}
 SUPPORTED_EXTENSIONS = {".js", ".ts", ".py", ".go", ".java", ".kt"}
+PRUNE_DIRS = {".git", "node_modules", "__pycache__", ".venv"}
 MAX_FILE_SIZE = 512 * 1024  # 512 KB to avoid massive files
 MAX_CONTENT_CHARS = 8_000
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Single compiled alternation so each path is scanned once in C rather than once per hint.
+_ROUTE_HINT_PATTERN = re.compile("|".join(re.escape(hint) for hint in sorted(ROUTE_HINTS)))
 
 
 def extract_route_files(repo_path: str, limit: int = 25) -> List[Dict[str, str]]:
@@ -22,25 +31,69 @@ def extract_route_files(repo_path: str, limit: int = 25) -> List[Dict[str, str]]
         raise FileNotFoundError(repo_path)
 
     matches: List[Dict[str, str]] = []
-    for path in repo.rglob("*"):
-        if len(matches) >= limit:
-            break
-        if not path.is_file() or path.suffix not in SUPPORTED_EXTENSIONS:
+    # The walk is lazy: it only advances as far as needed to fill ``limit`` matches, and
+    # closing it releases any directory handles still open further up the tree.
+    candidates = _walk(str(repo), "")
+    try:
+        with ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="route-read") as executor:
+            # Read candidates in batches so unreadable files are replaced by the next ones
+            # while results keep the walk order.
+            while len(matches) < limit:
+                batch = list(itertools.islice(candidates, limit - len(matches)))
+                if not batch:
+                    break
+                matches.extend(match for match in executor.map(_read_snippet, batch) if match is not None)
+    finally:
+        candidates.close()
+
+    LOGGER.info("Identified %d candidate routing files", len(matches))
+    return matches
+
+
+def _walk(directory: str, relative: str) -> Iterator[Tuple[str, str]]:
+    """Yield (path, relative path) pairs of candidate routing files, pruning route-free dirs."""
+
+    # scandir order follows the filesystem (creation order on tmpfs, and parallel zip
+    # extraction creates files in random order), so sort to keep selection stable.
+    try:
+        with os.scandir(directory) as iterator:
+            entries = sorted(iterator, key=lambda entry: entry.name)
+    except OSError as exc:
+        LOGGER.warning("Failed to list %s: %s", directory, exc)
+        return
+
+    subdirs = []
+    for entry in entries:
+        entry_relative = os.path.join(relative, entry.name) if relative else entry.name
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name not in PRUNE_DIRS:
+                subdirs.append((entry.path, entry_relative))
+            continue
+        if not entry.is_file() or os.path.splitext(entry.name)[1] not in SUPPORTED_EXTENSIONS:
             continue
-        relative = path.relative_to(repo)
-        lower = str(relative).lower()
-        if not any(hint in lower for hint in ROUTE_HINTS):
+        if not _ROUTE_HINT_PATTERN.search(entry_relative.lower()):
             continue
         try:
-            if path.stat().st_size > MAX_FILE_SIZE:
-                LOGGER.debug("Skipping %s due to size", path)
+            if entry.stat().st_size > MAX_FILE_SIZE:
+                LOGGER.debug("Skipping %s due to size", entry.path)
                 continue
-            with path.open("r", encoding="utf-8", errors="ignore") as handle:
-                content = handle.read(MAX_CONTENT_CHARS)
         except OSError as exc:
-            LOGGER.warning("Failed to read %s: %s", path, exc)
+            LOGGER.warning("Failed to stat %s: %s", entry.path, exc)
             continue
-        matches.append({"path": str(path), "content": content})
+        yield entry.path, entry_relative
 
-    LOGGER.info("Identified %d candidate routing files", len(matches))
-    return matches
+    for subdir, subdir_relative in subdirs:
+        yield from _walk(subdir, subdir_relative)
+
+
+def _read_snippet(candidate: Tuple[str, str]) -> Optional[Dict[str, str]]:
+    path, relative = candidate
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as handle:
+            content = handle.read(MAX_CONTENT_CHARS)
+    except OSError as exc:
+        LOGGER.warning("Failed to read %s: %s", path, exc)
+        return None
+    # Report the repo-relative path: clones and zip extractions land in a fresh temp
+    # directory each run, and absolute paths would defeat the Groq response cache.
+    return {"path": relative.replace(os.path.sep, "/"), "content": content}
@@ -2,87 +2,154 @@
 
 from __future__ import annotations
 
-import json
+import atexit
+import functools
 import logging
 import os
-from typing import Any, Callable, Dict, Iterable, List
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Tuple
 
+import orjson
 from groq import Groq
+from pydantic import ValidationError
 
-from .models import ApiCollection, NoirEndpoint
-from .schema import API_COLLECTION_SCHEMA
+from ._groq_cache import cached_chat, store_chat
+from .models import ApiCollection, ApiEndpoint, NoirEndpoint
+from .schema import API_COLLECTION_RESPONSE_FORMAT, API_COLLECTION_SCHEMA_HASH
 
 LOGGER = logging.getLogger(__name__)
-MAX_REQUEST_CHARS = 12_000
+MODEL_CONTEXT_TOKENS = 131_072
+MAX_COMPLETION_TOKENS = 8192
+PROMPT_OVERHEAD_TOKENS = 1024  # system prompt, schema and message framing
+# UTF-8 bytes approximate tokens well for JSON: ASCII averages ~4 bytes per token while
+# multi-byte text costs more bytes and therefore more of the budget.
+BYTES_PER_TOKEN = 4
+# The default budget stays small enough for low Groq tokens-per-minute tiers; raise it to
+# send fewer, larger chunks. It can never exceed what fits next to the completion.
+MAX_REQUEST_TOKENS = min(
+    int(os.getenv("GROQ_MAX_REQUEST_TOKENS", "3000")),
+    MODEL_CONTEXT_TOKENS - MAX_COMPLETION_TOKENS - PROMPT_OVERHEAD_TOKENS,
+)
+MAX_REQUEST_BYTES = MAX_REQUEST_TOKENS * BYTES_PER_TOKEN
+LIST_SEPARATOR_BYTES = len(b",")
+MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "5"))
+
+COMPLETION_OPTIONS: Dict[str, Any] = {
+    "model": "openai/gpt-oss-120b",
+    "temperature": 0.2,
+    "max_completion_tokens": MAX_COMPLETION_TOKENS,
+    "top_p": 1,
+    "reasoning_effort": "medium",
+}
+
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": (
+        "You are an API architect. Merge Noir endpoints with the provided route files, "
+        "infer missing endpoints, and respond ONLY with valid JSON following the schema."
+    ),
+}
 
 
 class GroqError(RuntimeError):
     """Raised when the Groq API fails."""
 
 
-def build_api_collection(base_url: str, noir_endpoints: List[NoirEndpoint], route_files: List[Dict[str, str]]) -> ApiCollection:
+def build_api_collection(
+    base_url: str,
+    noir_endpoints: List[NoirEndpoint],
+    route_files: List[Dict[str, str]],
+    refresh: bool = False,
+) -> ApiCollection:
+    """Synthesize an ApiCollection, reusing cached Groq answers unless ``refresh`` is set."""
+
     api_key = os.getenv("GROQ_API_KEY")
     if not api_key:
         raise GroqError("GROQ_API_KEY is not set")
 
-    client = Groq(api_key=api_key)
-
-    system_msg = {
-        "role": "system",
-        "content": (
-            "You are an API architect. Merge Noir endpoints with the provided route files, "
-            "infer missing endpoints, and respond ONLY with valid JSON following the schema."
-        ),
-    }
+    client = _client(api_key)
 
     payloads = _prepare_payloads(base_url, noir_endpoints, route_files)
 
-    collections: List[ApiCollection] = []
-    for index, payload in enumerate(payloads, start=1):
-        user_msg = {"role": "user", "content": json.dumps(payload, default=lambda o: o.dict(by_alias=True))}
-
-        LOGGER.info(
-            "Requesting Groq API to synthesize ApiCollection (chunk %d/%d)",
-            index,
-            len(payloads),
-        )
-        response = client.chat.completions.create(
-            model="openai/gpt-oss-120b",
-            messages=[system_msg, user_msg],
-            temperature=0.2,
-            max_completion_tokens=8192,
-            top_p=1,
-            reasoning_effort="medium",
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "api_collection",
-                    "schema": API_COLLECTION_SCHEMA,
-                    "strict": True,
-                },
-            },
-            stream=False,
-        )
-
-        content = response.choices[0].message.content  # type: ignore[index]
-        if not content:
-            raise GroqError("Groq response was empty")
-
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError as exc:
-            LOGGER.error("Groq returned invalid JSON: %s", content)
-            raise GroqError("Groq returned invalid JSON") from exc
+    # Chunks are independent until the final merge, so issue them concurrently.
+    # Results are collected in payload order to keep the merge deterministic.
+    total = len(payloads)
+    workers = max(1, min(MAX_CONCURRENCY, total))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="groq")
+    try:
+        futures = [
+            executor.submit(_request_collection, client, index, total, payload, refresh)
+            for index, payload in enumerate(payloads, start=1)
+        ]
+        wait(futures, return_when=FIRST_EXCEPTION)
+        collections = [future.result() for future in futures]
+    except BaseException:
+        # Any failed chunk fails the whole collection: drop queued chunks and raise
+        # right away instead of waiting for the requests still in flight.
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
 
-        try:
-            collection = ApiCollection(**data)
-        except Exception as exc:  # pylint: disable=broad-except
-            LOGGER.error("Groq JSON did not match ApiCollection: %s", data)
-            raise GroqError("Groq JSON failed validation") from exc
+    return _merge_collections(collections)
 
-        collections.append(collection)
 
-    return _merge_collections(collections)
+@functools.lru_cache(maxsize=1)
+def _client(api_key: str) -> Groq:
+    """Return a shared Groq client so its keep-alive connection pool is reused."""
+
+    client = Groq(api_key=api_key)
+    atexit.register(client.close)
+    return client
+
+
+def _request_collection(
+    client: Groq, index: int, total: int, payload: Dict[str, Any], refresh: bool = False
+) -> ApiCollection:
+    """Ask Groq to synthesize an ApiCollection for a single payload chunk."""
+
+    user_msg = {"role": "user", "content": orjson.dumps(payload).decode()}
+    messages = [SYSTEM_MESSAGE, user_msg]
+
+    # Identical requests yield reusable answers, so key the cache on everything we send.
+    request_key = orjson.dumps({**COMPLETION_OPTIONS, "messages": messages}, option=orjson.OPT_SORT_KEYS)
+    # A refresh still stores the new answer, replacing the stale entry.
+    content = None if refresh else cached_chat(request_key, API_COLLECTION_SCHEMA_HASH)
+    if content is not None:
+        LOGGER.info("Using cached Groq ApiCollection (chunk %d/%d)", index, total)
+        return _parse_collection(content)
+
+    LOGGER.info(
+        "Requesting Groq API to synthesize ApiCollection (chunk %d/%d)",
+        index,
+        total,
+    )
+    response = client.chat.completions.create(
+        **COMPLETION_OPTIONS,
+        messages=messages,
+        response_format=API_COLLECTION_RESPONSE_FORMAT,
+        stream=False,
+    )
+
+    content = response.choices[0].message.content  # type: ignore[index]
+    if not content:
+        raise GroqError("Groq response was empty")
+
+    collection = _parse_collection(content)
+    store_chat(request_key, API_COLLECTION_SCHEMA_HASH, content)
+    return collection
+
+
+def _parse_collection(content: str) -> ApiCollection:
+    """Parse and validate the JSON content returned by Groq in a single pass."""
+
+    try:
+        return ApiCollection.model_validate_json(content)
+    except ValidationError as exc:
+        if any(error["type"] == "json_invalid" for error in exc.errors()):
+            LOGGER.error("Groq returned invalid JSON: %s", content)
+            raise GroqError("Groq returned invalid JSON") from exc
+        LOGGER.error("Groq JSON did not match ApiCollection: %s", content)
+        raise GroqError("Groq JSON failed validation") from exc
 
 
 def _serialize_endpoints(endpoints: Iterable[NoirEndpoint]) -> List[Dict[str, Any]]:
@@ -91,26 +158,33 @@ def _serialize_endpoints(endpoints: Iterable[NoirEndpoint]) -> List[Dict[str, An
     return [endpoint.dict(by_alias=True) for endpoint in endpoints]
 
 
-def _chunk_list_by_size(items: List[Any], size_builder: Callable[[List[Any]], int], max_chars: int) -> List[List[Any]]:
-    """Split a list into chunks whose serialized size stays under max_chars."""
+def _chunk_list_by_size(
+    items: List[Any],
+    item_size_fn: Callable[[Any], int],
+    max_bytes: int,
+    base_overhead: int,
+) -> List[List[Any]]:
+    """Split a list into chunks whose serialized size stays under max_bytes.
+
+    Each item is measured once and a running total is kept, so the cost is linear in
+    the number of items. ``base_overhead`` is the serialized size of the enclosing
+    payload with the list left empty.
+    """
 
     chunks: List[List[Any]] = []
     current: List[Any] = []
+    running = base_overhead
     for item in items:
-        candidate = current + [item]
-        if size_builder(candidate) <= max_chars:
-            current = candidate
-            continue
-
-        if not current:
-            # Even the single item is too large; force it into its own chunk to avoid
-            # infinite loops and let the API return a clearer error.
-            chunks.append([item])
+        size = item_size_fn(item) + LIST_SEPARATOR_BYTES
+        if current and running + size > max_bytes:
+            chunks.append(current)
             current = []
-            continue
+            running = base_overhead
 
-        chunks.append(current)
-        current = [item]
+        # A single item that is too large still gets its own chunk to avoid infinite
+        # loops and let the API return a clearer error.
+        current.append(item)
+        running += size
 
     if current:
         chunks.append(current)
@@ -123,37 +197,40 @@ def _prepare_payloads(base_url: str, noir_endpoints: List[NoirEndpoint], route_f
 
     base_payload = {"baseUrl": base_url}
 
-    def endpoint_size(chunk: Iterable[NoirEndpoint]) -> int:
-        payload = {**base_payload, "noirEndpoints": _serialize_endpoints(chunk), "routeFiles": []}
-        return len(json.dumps(payload))
-
-    def route_size(endpoint_chunk: Iterable[NoirEndpoint], route_chunk: Iterable[Dict[str, str]]) -> int:
-        payload = {
-            **base_payload,
-            "noirEndpoints": _serialize_endpoints(endpoint_chunk),
-            "routeFiles": list(route_chunk),
-        }
-        return len(json.dumps(payload))
-
-    endpoint_chunks = _chunk_list_by_size(noir_endpoints, endpoint_size, MAX_REQUEST_CHARS)
+    # Serialize and measure every endpoint and route file exactly once; chunking then
+    # only works on indices and these precomputed sizes.
+    endpoint_dicts = _serialize_endpoints(noir_endpoints)
+    endpoint_sizes = [len(orjson.dumps(endpoint)) for endpoint in endpoint_dicts]
+    route_sizes = [len(orjson.dumps(route_file)) for route_file in route_files]
+
+    endpoint_overhead = len(orjson.dumps({**base_payload, "noirEndpoints": [], "routeFiles": []}))
+    endpoint_index_chunks = _chunk_list_by_size(
+        list(range(len(endpoint_dicts))),
+        endpoint_sizes.__getitem__,
+        MAX_REQUEST_BYTES,
+        endpoint_overhead,
+    )
     # Ensure we still send the route files to Groq even when Noir found no endpoints.
-    if not endpoint_chunks:
-        endpoint_chunks = [[]]
+    if not endpoint_index_chunks:
+        endpoint_index_chunks = [[]]
 
     payloads: List[Dict[str, Any]] = []
-    for endpoint_chunk in endpoint_chunks:
-        route_chunks = _chunk_list_by_size(
-            route_files,
-            lambda chunk: route_size(endpoint_chunk, chunk),
-            MAX_REQUEST_CHARS,
+    for endpoint_indices in endpoint_index_chunks:
+        endpoint_chunk = [endpoint_dicts[index] for index in endpoint_indices]
+        route_overhead = endpoint_overhead + sum(endpoint_sizes[index] + LIST_SEPARATOR_BYTES for index in endpoint_indices)
+        route_index_chunks = _chunk_list_by_size(
+            list(range(len(route_files))),
+            route_sizes.__getitem__,
+            MAX_REQUEST_BYTES,
+            route_overhead,
         ) or [[]]
 
-        for route_chunk in route_chunks:
+        for route_indices in route_index_chunks:
             payloads.append(
                 {
                     **base_payload,
                     "noirEndpoints": endpoint_chunk,
-                    "routeFiles": route_chunk,
+                    "routeFiles": [route_files[index] for index in route_indices],
                 }
             )
 
@@ -161,14 +238,17 @@ def _prepare_payloads(base_url: str, noir_endpoints: List[NoirEndpoint], route_f
 
 
 def _merge_collections(collections: List[ApiCollection]) -> ApiCollection:
-    """Merge multiple ApiCollections into a single consolidated collection."""
+    """Merge multiple ApiCollections into a single consolidated collection.
+
+    Endpoints are deduplicated on ``(METHOD, path)``; when chunks disagree the most
+    detailed variant wins while keeping the position of the first occurrence.
+    """
 
     if not collections:
         raise GroqError("Groq did not return any collections")
 
     base = collections[0]
-    merged_endpoints = []
-    seen = set()
+    merged: Dict[Tuple[str, str], ApiEndpoint] = {}
 
     for collection in collections:
         if collection.baseUrl != base.baseUrl:
@@ -176,14 +256,25 @@ def _merge_collections(collections: List[ApiCollection]) -> ApiCollection:
 
         for endpoint in collection.endpoints:
             key = (endpoint.method.upper(), endpoint.path)
-            if key in seen:
-                continue
-            seen.add(key)
-            merged_endpoints.append(endpoint)
+            existing = merged.get(key)
+            if existing is None or _detail_score(endpoint) > _detail_score(existing):
+                merged[key] = endpoint
 
     return ApiCollection(
         title=base.title,
         version=base.version,
         baseUrl=base.baseUrl,
-        endpoints=merged_endpoints,
+        endpoints=list(merged.values()),
+    )
+
+
+def _detail_score(endpoint: ApiEndpoint) -> int:
+    """Rough measure of how much information an endpoint carries."""
+
+    return (
+        len(endpoint.pathParams)
+        + len(endpoint.queryParams)
+        + len(endpoint.headers)
+        + len(endpoint.responses)
+        + (1 if endpoint.requestBody else 0)
     )
@@ -2,53 +2,104 @@
 
 from __future__ import annotations
 
-import json
+import functools
 import logging
 import shutil
 import subprocess
-from typing import Iterable, List
+from collections import deque
+from typing import Deque, Dict, Iterable, List
 
+import orjson
+from pydantic import TypeAdapter, ValidationError
+
+from ._noir_cache import cache_key, cached_endpoints, store_endpoints
 from .models import NoirEndpoint
 
 LOGGER = logging.getLogger(__name__)
 
+_ENDPOINTS_ADAPTER = TypeAdapter(List[NoirEndpoint])
+
 
 class NoirError(RuntimeError):
     """Raised when Noir cannot be executed."""
 
 
-def run_noir(repo_path: str, base_url: str) -> List[NoirEndpoint]:
-    """Execute OWASP Noir and parse the resulting endpoints."""
+@functools.lru_cache(maxsize=1)
+def _noir_bin() -> str:
+    """Resolve the Noir binary once; failures are not cached so a later install is picked up."""
 
-    if not shutil.which("noir"):
+    path = shutil.which("noir")
+    if not path:
         raise NoirError("Noir binary not found in PATH. Please install OWASP Noir.")
+    return path
+
+
+def run_noir(repo_path: str, base_url: str, refresh: bool = False) -> List[NoirEndpoint]:
+    """Execute OWASP Noir and parse the resulting endpoints.
+
+    Results are cached on disk per repository state and base URL, so unchanged
+    repositories skip the Noir run entirely. ``refresh`` ignores the cached entry and
+    replaces it with a fresh scan.
+    """
 
-    cmd = ["noir", "-b", repo_path, "-u", base_url, "-f", "json", "-T"]
+    key = cache_key(repo_path, base_url)
+    cached = None if refresh else cached_endpoints(key)
+    if cached is not None:
+        endpoints = _validate_endpoints(cached)
+        LOGGER.info("Loaded %d cached Noir endpoints", len(endpoints))
+        return endpoints
+
+    cmd = [_noir_bin(), "-b", repo_path, "-u", base_url, "-f", "json", "-T"]
     LOGGER.info("Running Noir: %s", " ".join(cmd))
     try:
         result = subprocess.run(cmd, capture_output=True, check=True)
+    except FileNotFoundError as exc:
+        # The cached path went stale (binary removed or moved); resolve it again next run.
+        _noir_bin.cache_clear()
+        raise NoirError(f"Noir binary not found at {cmd[0]}. Please install OWASP Noir.") from exc
     except subprocess.CalledProcessError as exc:
         stderr = exc.stderr.decode("utf-8", "ignore")
         LOGGER.error("Noir failed: %s", stderr)
         raise NoirError(f"Noir failed: {stderr}") from exc
 
-    stdout = result.stdout.decode("utf-8", "ignore")
+    payload = _parse_output(result.stdout)
+
+    endpoints = _validate_endpoints(list(_extract_endpoints(payload)))
+    LOGGER.info("Parsed %d endpoints from Noir", len(endpoints))
+    store_endpoints(key, [endpoint.dict(by_alias=True) for endpoint in endpoints])
+    return endpoints
+
+
+def _parse_output(stdout: bytes) -> object:
+    """Parse Noir's JSON output straight from the captured bytes."""
+
     try:
-        payload = json.loads(stdout)
-    except json.JSONDecodeError as exc:
+        return orjson.loads(stdout)
+    except orjson.JSONDecodeError:
+        pass
+
+    # orjson rejects invalid UTF-8 outright; only then pay for a lenient decode.
+    try:
+        return orjson.loads(stdout.decode("utf-8", "ignore"))
+    except orjson.JSONDecodeError as exc:
         LOGGER.error("Failed to parse Noir output: %s", exc)
         raise NoirError("Noir did not return valid JSON") from exc
 
-    raw_endpoints = _extract_endpoints(payload)
 
-    endpoints = []
-    for endpoint in raw_endpoints:
-        try:
-            endpoints.append(NoirEndpoint(**endpoint))
-        except Exception as exc:  # pylint: disable=broad-except
-            LOGGER.warning("Skipping malformed Noir endpoint %s: %s", endpoint, exc)
-    LOGGER.info("Parsed %d endpoints from Noir", len(endpoints))
-    return endpoints
+def _validate_endpoints(raw_endpoints: List[dict]) -> List[NoirEndpoint]:
+    """Validate raw endpoints in one batch, dropping only the malformed ones."""
+
+    try:
+        return _ENDPOINTS_ADAPTER.validate_python(raw_endpoints)
+    except ValidationError as exc:
+        errors_by_index: Dict[int, List[str]] = {}
+        for error in exc.errors():
+            errors_by_index.setdefault(error["loc"][0], []).append(error["msg"])
+
+    for index, messages in errors_by_index.items():
+        LOGGER.warning("Skipping malformed Noir endpoint %s: %s", raw_endpoints[index], "; ".join(messages))
+    valid = [endpoint for index, endpoint in enumerate(raw_endpoints) if index not in errors_by_index]
+    return _ENDPOINTS_ADAPTER.validate_python(valid)
 
 
 def _extract_endpoints(payload: object) -> Iterable[dict]:
@@ -56,25 +107,27 @@ def _extract_endpoints(payload: object) -> Iterable[dict]:
 
     Noir has historically emitted endpoints under a variety of keys and nesting levels
     (e.g. ``endpoints``, ``active_results`` or nested under ``data``/``results``). We
-    therefore perform a recursive walk of the JSON payload and collect every mapping
+    therefore walk the whole JSON payload and collect every mapping
     that looks like an endpoint (it has both ``method`` and ``url`` keys). This is
     defensive but avoids silently returning zero endpoints when Noir succeeds but
-    changes its output shape.
+    changes its output shape. Matched endpoints are not descended into, since their
+    params and code paths can never contain further endpoints.
     """
 
     endpoints: List[dict] = []
 
-    def walk(obj: object) -> None:
+    # Iterative depth-first walk; children are pushed in reverse so endpoints come out in
+    # document order, exactly as a recursive walk would produce them.
+    stack: Deque[object] = deque([payload])
+    while stack:
+        obj = stack.pop()
         if isinstance(obj, dict):
             if "method" in obj and "url" in obj:
                 endpoints.append(obj)
-            for value in obj.values():
-                walk(value)
+                continue
+            stack.extend(reversed(obj.values()))
         elif isinstance(obj, list):
-            for item in obj:
-                walk(item)
-
-    walk(payload)
+            stack.extend(reversed(obj))
 
     if not endpoints:
         top_level_keys: List[str] = []
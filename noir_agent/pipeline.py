@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 
 from .code_analyzer import extract_route_files
@@ -10,13 +11,13 @@ from .groq_processor import GroqError, build_api_collection
 from .models import ApiCollection
 from .noir_runner import NoirError, run_noir
 from .postman import build_postman_collection, save_postman_collection
-from .repo_manager import RepoError, cleanup_repo, clone_or_use_repo
+from .repo_manager import RepoError, RepoSource, cleanup_repo, clone_or_use_repo
 
 LOGGER = logging.getLogger(__name__)
 
 
 @contextmanager
-def _repo_context(repo: str):
+def _repo_context(repo: RepoSource):
     repo_path, cleanup_dir = clone_or_use_repo(repo)
     try:
         yield repo_path
@@ -24,17 +25,21 @@ def _repo_context(repo: str):
         cleanup_repo(cleanup_dir)
 
 
-def generate_api_collection(repo: str, base_url: str) -> ApiCollection:
+def generate_api_collection(repo: RepoSource, base_url: str, refresh: bool = False) -> ApiCollection:
     with _repo_context(repo) as repo_path:
-        noir_endpoints = run_noir(repo_path, base_url)
-        route_files = extract_route_files(repo_path)
-        collection = build_api_collection(base_url, noir_endpoints, route_files)
+        # Noir runs in a child process and the route scan is mostly I/O, so overlap them.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            noir_future = executor.submit(run_noir, repo_path, base_url, refresh)
+            routes_future = executor.submit(extract_route_files, repo_path)
+            noir_endpoints = noir_future.result()
+            route_files = routes_future.result()
+        collection = build_api_collection(base_url, noir_endpoints, route_files, refresh)
     return collection
 
 
-def run_pipeline(repo: str, base_url: str, output_path: str) -> str:
+def run_pipeline(repo: RepoSource, base_url: str, output_path: str, refresh: bool = False) -> str:
     LOGGER.info("Starting pipeline for repo=%s base_url=%s", repo, base_url)
-    collection = generate_api_collection(repo, base_url)
+    collection = generate_api_collection(repo, base_url, refresh)
     postman = build_postman_collection(collection)
     save_postman_collection(postman, output_path)
     LOGGER.info("Pipeline finished successfully")
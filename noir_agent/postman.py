@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from pathlib import Path
 from typing import Dict, List
 
+import orjson
+
+from ._storage import atomic_write
 from .models import ApiCollection, ApiEndpoint, ApiParam
 
 LOGGER = logging.getLogger(__name__)
@@ -47,7 +49,7 @@ def _endpoint_to_postman(base_var: str, endpoint: ApiEndpoint) -> Dict[str, obje
         example = endpoint.requestBody.get("example") or endpoint.requestBody
         body = {
             "mode": "raw",
-            "raw": json.dumps(example, indent=2),
+            "raw": orjson.dumps(example, option=orjson.OPT_INDENT_2).decode(),
             "options": {"raw": {"language": "json"}},
         }
 
@@ -86,7 +88,6 @@ def build_postman_collection(collection: ApiCollection) -> Dict[str, object]:
 
 def save_postman_collection(collection: Dict[str, object], output_path: str) -> None:
     path = Path(output_path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as handle:
-        json.dump(collection, handle, indent=2)
+    # Readers (the web UI polls for this file) never observe a partial collection.
+    atomic_write(path, orjson.dumps(collection, option=orjson.OPT_INDENT_2))
     LOGGER.info("Postman collection saved to %s", path)
@@ -7,12 +7,30 @@ import os
 import shutil
 import subprocess
 import tempfile
+import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple
+from typing import BinaryIO, List, Tuple, Union
 from urllib.parse import urlparse
 
 LOGGER = logging.getLogger(__name__)
+EXTRACT_WORKERS = 4
+FULL_CLONE = os.getenv("NOIR_AGENT_FULL_CLONE", "") not in {"", "0"}
+
+# Binary assets that neither Noir nor the route scan ever read. Git URLs are cloned
+# without blobs and sparse-checked-out without these, so they are never downloaded.
+SPARSE_EXCLUDE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.bmp", "*.ico", "*.webp", "*.psd",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp3", "*.mp4", "*.mov", "*.avi", "*.webm", "*.wav",
+    "*.pdf", "*.zip", "*.tar", "*.gz", "*.tgz", "*.7z", "*.rar",
+    "*.jar", "*.war", "*.exe", "*.dll", "*.so", "*.dylib", "*.bin",
+]
+
+
+# A repository path, git URL or .zip path, or an open binary stream of a zip archive.
+RepoSource = Union[str, BinaryIO]
 
 
 class RepoError(RuntimeError):
@@ -26,15 +44,18 @@ def _is_git_url(value: str) -> bool:
     return value.endswith(".git")
 
 
-def _extract_repo_zip(zip_path: Path) -> Tuple[str, str]:
+def _extract_repo_zip(zip_source: Union[Path, BinaryIO]) -> Tuple[str, str]:
+    label = zip_source if isinstance(zip_source, Path) else "uploaded archive"
     tmp_dir = tempfile.mkdtemp(prefix="noir-repo-zip-")
-    LOGGER.info("Extracting %s into %s", zip_path, tmp_dir)
+    LOGGER.info("Extracting %s into %s", label, tmp_dir)
     try:
-        with zipfile.ZipFile(zip_path, "r") as archive:
-            archive.extractall(tmp_dir)
+        _extract_zip(zip_source, tmp_dir)
     except zipfile.BadZipFile as exc:  # pragma: no cover - zipfile errors are edge cases
         shutil.rmtree(tmp_dir, ignore_errors=True)
-        raise RepoError(f"Repository archive '{zip_path}' is not a valid zip file") from exc
+        raise RepoError(f"Repository archive '{label}' is not a valid zip file") from exc
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
 
     extracted_path = Path(tmp_dir)
     subdirs = [child for child in extracted_path.iterdir() if child.is_dir()]
@@ -45,9 +66,64 @@ def _extract_repo_zip(zip_path: Path) -> Tuple[str, str]:
     return str(repo_root), tmp_dir
 
 
-def clone_or_use_repo(repo: str) -> Tuple[str, str]:
+def _extract_zip(zip_source: Union[Path, BinaryIO], target_dir: str) -> None:
+    """Extract an archive, using several threads when it can be reopened by path.
+
+    Each thread reads through its own handle; inflating and CRC checks release the GIL,
+    so large archives extract noticeably faster.
+    """
+
+    with zipfile.ZipFile(zip_source, "r") as archive:
+        members = archive.infolist()
+
+        # Create every directory up front so the workers never race on mkdir.
+        for member in members:
+            target = _member_target(target_dir, member)
+            os.makedirs(target if member.is_dir() else os.path.dirname(target), exist_ok=True)
+
+        files = [member for member in members if not member.is_dir()]
+        if not isinstance(zip_source, Path):
+            # A stream cannot be reopened per worker, so extract it on this thread.
+            _extract_members(archive, files, target_dir)
+            return
+
+    batches = [files[offset::EXTRACT_WORKERS] for offset in range(EXTRACT_WORKERS)]
+
+    def extract(batch: List[zipfile.ZipInfo]) -> None:
+        with zipfile.ZipFile(zip_source, "r") as archive:
+            _extract_members(archive, batch, target_dir)
+
+    with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS, thread_name_prefix="unzip") as executor:
+        list(executor.map(extract, [batch for batch in batches if batch]))
+
+
+def _extract_members(archive: zipfile.ZipFile, members: List[zipfile.ZipInfo], target_dir: str) -> None:
+    for member in members:
+        extracted = archive.extract(member, target_dir)
+        # Keep the archived timestamps so re-extracting the same zip yields an
+        # identical tree fingerprint for the Noir result cache.
+        timestamp = time.mktime(member.date_time + (0, 0, -1))
+        os.utime(extracted, (timestamp, timestamp))
+
+
+def _member_target(target_dir: str, member: zipfile.ZipInfo) -> str:
+    """Return where ZipFile.extract places a member, mirroring its name sanitization."""
+
+    arcname = member.filename.replace("/", os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    invalid_parts = ("", os.path.curdir, os.path.pardir)
+    arcname = os.path.sep.join(part for part in arcname.split(os.path.sep) if part not in invalid_parts)
+    return os.path.normpath(os.path.join(target_dir, arcname))
+
+
+def clone_or_use_repo(repo: RepoSource) -> Tuple[str, str]:
     """Return a tuple of (repo_path, cleanup_dir)."""
 
+    if not isinstance(repo, str):
+        return _extract_repo_zip(repo)
+
     repo_path = Path(repo)
     if repo_path.exists():
         if repo_path.is_dir():
@@ -63,6 +139,19 @@ def clone_or_use_repo(repo: str) -> Tuple[str, str]:
 
     tmp_dir = tempfile.mkdtemp(prefix="noir-repo-")
     LOGGER.info("Cloning %s into %s", repo, tmp_dir)
+    if not FULL_CLONE:
+        try:
+            _sparse_clone(repo, tmp_dir)
+            return tmp_dir, tmp_dir
+        except subprocess.CalledProcessError as exc:
+            # Older git releases lack partial clones or no-cone sparse checkouts.
+            LOGGER.warning(
+                "Sparse clone failed, retrying with a full shallow clone: %s",
+                exc.stderr.decode("utf-8", "ignore").strip(),
+            )
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.mkdir(tmp_dir)
+
     try:
         subprocess.run(["git", "clone", "--depth", "1", repo, tmp_dir], check=True, capture_output=True)
     except subprocess.CalledProcessError as exc:
@@ -74,6 +163,22 @@ def clone_or_use_repo(repo: str) -> Tuple[str, str]:
     return tmp_dir, tmp_dir
 
 
+def _sparse_clone(repo: str, target_dir: str) -> None:
+    """Clone without blobs and check out everything except SPARSE_EXCLUDE_PATTERNS."""
+
+    subprocess.run(
+        ["git", "clone", "--depth", "1", "--filter=blob:none", "--sparse", repo, target_dir],
+        check=True,
+        capture_output=True,
+    )
+    patterns = ["/*"] + [f"!{pattern}" for pattern in SPARSE_EXCLUDE_PATTERNS]
+    subprocess.run(
+        ["git", "-C", target_dir, "sparse-checkout", "set", "--no-cone", *patterns],
+        check=True,
+        capture_output=True,
+    )
+
+
 def cleanup_repo(cleanup_dir: str) -> None:
     if cleanup_dir and os.path.exists(cleanup_dir):
         LOGGER.info("Cleaning up %s", cleanup_dir)
@@ -1,5 +1,45 @@
 """JSON schema shared with the Groq LLM."""
 
+import hashlib
+import json
+
+# Parameter and response shapes are inlined at every use instead of being referenced
+# through ``definitions``, so validators never resolve a ``$ref`` per array element.
+_API_PARAM = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["name", "in", "required"],
+    "properties": {
+        "name": {"type": "string"},
+        "in": {
+            "type": "string",
+            "enum": ["path", "query", "header"]
+        },
+        "required": {"type": "boolean"},
+        "type": {"type": "string", "default": "string"},
+        "description": {"type": "string", "default": ""}
+    }
+}
+
+_API_RESPONSE = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["status"],
+    "properties": {
+        "status": {"type": "integer", "minimum": 100, "maximum": 599},
+        "contentType": {
+            "type": "string",
+            "default": "application/json"
+        },
+        "schema": {
+            "type": "object",
+            "default": {},
+            "additionalProperties": True
+        },
+        "example": {}
+    }
+}
+
 API_COLLECTION_SCHEMA = {
     "$schema": "https://json-schema.org/draft/2020-12/schema",
     "title": "ApiCollection",
@@ -27,21 +67,24 @@ API_COLLECTION_SCHEMA = {
                     "source"
                 ],
                 "properties": {
-                    "method": {"type": "string"},
-                    "path": {"type": "string"},
+                    "method": {
+                        "type": "string",
+                        "enum": ["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS", "TRACE"]
+                    },
+                    "path": {"type": "string", "pattern": "^/"},
                     "summary": {"type": "string"},
                     "description": {"type": "string"},
                     "pathParams": {
                         "type": "array",
-                        "items": {"$ref": "#/definitions/ApiParam"}
+                        "items": _API_PARAM
                     },
                     "queryParams": {
                         "type": "array",
-                        "items": {"$ref": "#/definitions/ApiParam"}
+                        "items": _API_PARAM
                     },
                     "headers": {
                         "type": "array",
-                        "items": {"$ref": "#/definitions/ApiParam"}
+                        "items": _API_PARAM
                     },
                     "requestBody": {
                         "type": ["object", "null"],
@@ -49,7 +92,7 @@ API_COLLECTION_SCHEMA = {
                     },
                     "responses": {
                         "type": "array",
-                        "items": {"$ref": "#/definitions/ApiResponse"},
+                        "items": _API_RESPONSE,
                         "minItems": 1
                     },
                     "source": {
@@ -59,42 +102,22 @@ API_COLLECTION_SCHEMA = {
                 }
             }
         }
-    },
-    "definitions": {
-        "ApiParam": {
-            "type": "object",
-            "additionalProperties": False,
-            "required": ["name", "in", "required"],
-            "properties": {
-                "name": {"type": "string"},
-                "in": {
-                    "type": "string",
-                    "enum": ["path", "query", "header"]
-                },
-                "required": {"type": "boolean"},
-                "type": {"type": "string", "default": "string"},
-                "description": {"type": "string", "default": ""}
-            }
-        },
-        "ApiResponse": {
-            "type": "object",
-            "additionalProperties": False,
-            "required": ["status"],
-            "properties": {
-                "status": {"type": "integer"},
-                "contentType": {
-                    "type": "string",
-                    "default": "application/json"
-                },
-                "schema": {
-                    "type": "object",
-                    "default": {},
-                    "additionalProperties": True
-                },
-                "example": {}
-            }
-        }
     }
 }
 
-__all__ = ["API_COLLECTION_SCHEMA"]
+# Structured-output request parameter, built once and shared by every Groq call.
+API_COLLECTION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "api_collection",
+        "schema": API_COLLECTION_SCHEMA,
+        "strict": True,
+    },
+}
+
+# Identifies the schema revision so cached Groq responses are invalidated when it changes.
+API_COLLECTION_SCHEMA_HASH = hashlib.blake2b(
+    json.dumps(API_COLLECTION_SCHEMA, sort_keys=True).encode(), digest_size=16
+).hexdigest()
+
+__all__ = ["API_COLLECTION_RESPONSE_FORMAT", "API_COLLECTION_SCHEMA", "API_COLLECTION_SCHEMA_HASH"]
@@ -3,20 +3,51 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import logging
 import os
-import shutil
+import sys
 import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import IO, Dict, Iterator, Optional
+from urllib.parse import urlparse, urlunparse
 
-from flask import Flask, flash, redirect, render_template, request, send_from_directory, url_for
+import click
+import orjson
+from flask import (
+    Flask,
+    abort,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    send_from_directory,
+    session,
+    stream_template,
+    url_for,
+)
+from jinja2 import ChoiceLoader, ModuleLoader
 from werkzeug.utils import secure_filename
 
+from ._storage import atomic_write
 from .pipeline import run_pipeline
+from .repo_manager import RepoSource
 
 LOGGER = logging.getLogger(__name__)
+UPLOAD_CHUNK_SIZE = 1 << 20
+SPOOL_MAX_SIZE = 32 * 1024 * 1024
+PREVIEW_CHUNK_SIZE = 64 * 1024
+POLL_TIMEOUT_SECONDS = 30 * 60
+MAX_UPLOAD_MB = int(os.getenv("NOIR_MAX_UPLOAD_MB", "512"))
+PIPELINE_WORKERS = int(os.getenv("NOIR_PIPELINE_WORKERS", "2"))
+COMPILED_TEMPLATES_DIR = os.getenv("NOIR_COMPILED_TEMPLATES")
+
+# Resolved and created once at import; every app instance and request reuses it.
+OUTPUT_DIR = Path("out").resolve()
+OUTPUT_DIR.mkdir(exist_ok=True)
 
 
 def create_app() -> Flask:
@@ -25,13 +56,47 @@ def create_app() -> Flask:
     if not secret_key:
         raise RuntimeError("FLASK_SECRET_KEY is not set")
     app.secret_key = secret_key
+    app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_MB * 1024 * 1024
+    # Behind nginx/Apache, hand downloads to the front-end server's sendfile path.
+    app.config["USE_X_SENDFILE"] = os.getenv("NOIR_USE_X_SENDFILE", "") not in {"", "0"}
+
+    # Templates precompiled with ``flask compile-templates`` are imported as Python
+    # modules, skipping Jinja's parse and compile step; sources remain the fallback.
+    source_loader = app.jinja_env.loader
+    if COMPILED_TEMPLATES_DIR:
+        app.jinja_env.loader = ChoiceLoader([ModuleLoader(COMPILED_TEMPLATES_DIR), source_loader])
+
+    @app.cli.command("compile-templates")
+    @click.argument("target")
+    def compile_templates(target: str) -> None:
+        """Precompile the UI templates into Python modules under TARGET."""
+
+        app.jinja_env.overlay(loader=source_loader).compile_templates(target, zip=None, ignore_errors=False)
+        click.echo(f"Compiled templates written to {target}")
+
+    # Pipelines run in the background so request threads are not pinned to long Noir
+    # and Groq calls; the browser polls /status until the collection is ready.
+    executor = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="pipeline")
+    jobs: Dict[str, Future] = {}
+    jobs_lock = threading.Lock()
+
+    def prune_jobs() -> None:
+        """Forget finished jobs; their outcome lives on disk. Call with ``jobs_lock`` held."""
+
+        for name in [name for name, job in jobs.items() if job.done()]:
+            del jobs[name]
 
-    output_dir = Path("out")
-    output_dir.mkdir(exist_ok=True)
+    # The form page only varies when flash messages are pending, so render it once and
+    # reuse the HTML for every plain GET.
+    index_cache: Dict[str, str] = {}
 
     @app.route("/", methods=["GET"])
     def index():
-        return render_template("index.html")
+        if "_flashes" in session:
+            return render_template("index.html")
+        if "html" not in index_cache:
+            index_cache["html"] = render_template("index.html")
+        return index_cache["html"]
 
     @app.route("/generate", methods=["POST"])
     def generate():
@@ -39,59 +104,217 @@ def create_app() -> Flask:
         base_url = request.form.get("base_url", "").strip()
         repo_file = request.files.get("repo_file")
 
-        repo_source: Optional[str] = repo if repo else None
-        repo_label = repo if repo else "Uploaded zip"
-        upload_dir: Optional[str] = None
+        force = request.form.get("force") == "1"
+
+        repo_source: Optional[RepoSource] = repo if repo else None
+        repo_label = _redact_userinfo(repo) if repo else "Uploaded zip"
+        hash_input = repo if repo else "Uploaded zip"
+        upload: Optional[IO[bytes]] = None
 
         if repo_file and repo_file.filename:
             filename = secure_filename(repo_file.filename)
             if not filename.lower().endswith(".zip"):
                 flash("Uploaded repository must be a .zip archive", "error")
                 return redirect(url_for("index"))
-            upload_dir = tempfile.mkdtemp(prefix="noir-upload-")
-            upload_path = Path(upload_dir) / filename
-            repo_file.save(upload_path)
-            repo_source = str(upload_path)
+            upload = _upload_buffer()
+            # Hash the archive while copying so identical uploads map to the same output.
+            digest = hashlib.blake2b(digest_size=16)
+            while chunk := repo_file.stream.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                upload.write(chunk)
+            upload.seek(0)
+            repo_source = upload
             repo_label = filename
+            hash_input = f"{filename}:{digest.hexdigest()}"
 
-        if not repo_source:
-            flash("Provide a repository path/URL or upload a zip file", "error")
-            return redirect(url_for("index"))
+        try:
+            if not repo_source:
+                flash("Provide a repository path/URL or upload a zip file", "error")
+                return redirect(url_for("index"))
 
-        if not base_url:
-            flash("Base URL is required", "error")
-            return redirect(url_for("index"))
+            if not base_url:
+                flash("Base URL is required", "error")
+                return redirect(url_for("index"))
 
-        hash_input = f"{repo_label}:{base_url}"
-        filename = f"postman_{hashlib.sha1(hash_input.encode()).hexdigest()[:10]}.json"
-        output_path = output_dir / filename
-        try:
-            run_pipeline(repo_source, base_url, str(output_path))
-        except Exception as exc:  # pylint: disable=broad-except
-            LOGGER.exception("Pipeline failed")
-            flash(str(exc), "error")
-            return redirect(url_for("index"))
+            hash_input = f"{hash_input}:{base_url}"
+            filename = f"postman_{hashlib.blake2b(hash_input.encode(), digest_size=5).hexdigest()}.json"
+            output_path = OUTPUT_DIR / filename
+            # Labels stay on the server; a query string would leak them into access logs,
+            # browser history and Referer headers.
+            atomic_write(_meta_path(output_path), orjson.dumps({"repo_label": repo_label, "base_url": base_url}))
+            with jobs_lock:
+                prune_jobs()
+                # Identical requests share one scan, including one started by another
+                # worker process; its pending marker claims the output.
+                if filename in jobs or _scan_in_progress(output_path):
+                    LOGGER.info("Joining in-flight scan for %s", filename)
+                # The filename is derived from the inputs, so an existing file is the answer
+                # to an identical earlier request unless a rerun is forced.
+                elif not force and output_path.exists() and output_path.stat().st_size > 0:
+                    LOGGER.info("Reusing existing collection %s", filename)
+                elif _claim_pending(output_path):
+                    _error_path(output_path).unlink(missing_ok=True)
+                    jobs[filename] = executor.submit(_run_job, repo_source, base_url, output_path, upload, force)
+                    # The job now owns the upload and closes it when the pipeline ends.
+                    upload = None
         finally:
-            if upload_dir:
-                shutil.rmtree(upload_dir, ignore_errors=True)
-        with output_path.open("r", encoding="utf-8") as handle:
-            preview = json.load(handle)
-        return render_template(
+            if upload is not None:
+                upload.close()
+
+        return redirect(url_for("result", filename=filename))
+
+    @app.route("/result/<path:filename>")
+    def result(filename: str):
+        safe_path = Path(filename).name
+        output_path = OUTPUT_DIR / safe_path
+        meta = _read_meta(output_path)
+        repo_label = meta.get("repo_label", "")
+        base_url = meta.get("base_url", "")
+
+        with jobs_lock:
+            prune_jobs()
+            running = safe_path in jobs
+
+        error_path = _error_path(output_path)
+        if not running and error_path.is_file():
+            flash(error_path.read_text(encoding="utf-8"), "error")
+            error_path.unlink(missing_ok=True)
+            return redirect(url_for("index"))
+        # Without a local job the scan may still be running in another worker process,
+        # which its pending marker reveals.
+        if running or _scan_in_progress(output_path):
+            return render_template(
+                "result.html",
+                filename=safe_path,
+                pending=True,
+                poll_timeout_ms=POLL_TIMEOUT_SECONDS * 1000,
+                base_url=base_url,
+                repo_label=repo_label,
+            )
+        if not output_path.is_file():
+            abort(404)
+
+        # save_postman_collection already writes indented JSON, so show it verbatim. The
+        # page is streamed and the preview is read in chunks, so neither the file nor the
+        # rendered page is ever held in memory as a whole.
+        return stream_template(
             "result.html",
-            filename=filename,
-            preview=json.dumps(preview, indent=2),
+            filename=safe_path,
+            pending=False,
+            preview=_iter_text(output_path),
             base_url=base_url,
             repo_label=repo_label,
         )
 
+    @app.route("/status/<path:filename>")
+    def status(filename: str):
+        safe_path = Path(filename).name
+        output_path = OUTPUT_DIR / safe_path
+        with jobs_lock:
+            prune_jobs()
+            running = safe_path in jobs
+        return jsonify(done=not running and not _scan_in_progress(output_path))
+
     @app.route("/download/<path:filename>")
     def download(filename: str):
         safe_path = Path(filename).name
-        return send_from_directory(output_dir, safe_path, as_attachment=True)
+        return send_from_directory(OUTPUT_DIR, safe_path, as_attachment=True)
 
     return app
 
 
+def _run_job(
+    repo_source: RepoSource, base_url: str, output_path: Path, upload: Optional[IO[bytes]], refresh: bool
+) -> None:
+    """Run the pipeline in the background, recording failures next to the output file."""
+
+    try:
+        run_pipeline(repo_source, base_url, str(output_path), refresh=refresh)
+    except Exception as exc:
+        LOGGER.exception("Pipeline failed")
+        # A file rather than in-memory state, so every worker process can report it.
+        _error_path(output_path).write_text(str(exc), encoding="utf-8")
+        raise
+    finally:
+        _pending_path(output_path).unlink(missing_ok=True)
+        if upload is not None:
+            upload.close()
+
+
+def _upload_buffer() -> IO[bytes]:
+    """Return a seekable scratch file for an uploaded archive.
+
+    Small archives stay in memory; larger ones spill to an anonymous temp file that is
+    removed as soon as it is closed. Before Python 3.11 SpooledTemporaryFile lacks
+    ``seekable()``, which zipfile requires, so use a plain temp file there.
+    """
+
+    if sys.version_info >= (3, 11):
+        return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    return tempfile.TemporaryFile()
+
+
+def _error_path(output_path: Path) -> Path:
+    return output_path.with_suffix(".error")
+
+
+def _pending_path(output_path: Path) -> Path:
+    return output_path.with_suffix(".pending")
+
+
+def _scan_in_progress(output_path: Path) -> bool:
+    """Whether any worker process holds a fresh pending marker for this output.
+
+    Markers left behind by a killed or restarted worker expire after
+    ``POLL_TIMEOUT_SECONDS`` so they cannot block the output forever.
+    """
+
+    try:
+        age = time.time() - _pending_path(output_path).stat().st_mtime
+    except FileNotFoundError:
+        return False
+    return age < POLL_TIMEOUT_SECONDS
+
+
+def _claim_pending(output_path: Path) -> bool:
+    """Atomically create the pending marker, replacing a stale one; ``False`` if taken."""
+
+    pending_path = _pending_path(output_path)
+    if not _scan_in_progress(output_path):
+        pending_path.unlink(missing_ok=True)
+    try:
+        pending_path.touch(exist_ok=False)
+    except FileExistsError:
+        return False
+    return True
+
+
+def _meta_path(output_path: Path) -> Path:
+    return output_path.with_suffix(".meta")
+
+
+def _read_meta(output_path: Path) -> Dict[str, str]:
+    try:
+        return orjson.loads(_meta_path(output_path).read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+
+def _redact_userinfo(repo: str) -> str:
+    """Drop credentials such as ``user:token@`` from a repository URL before display."""
+
+    parsed = urlparse(repo)
+    if "@" not in parsed.netloc:
+        return repo
+    return urlunparse(parsed._replace(netloc=parsed.netloc.rpartition("@")[2]))
+
+
+def _iter_text(path: Path) -> Iterator[str]:
+    with path.open("r", encoding="utf-8") as handle:
+        while chunk := handle.read(PREVIEW_CHUNK_SIZE):
+            yield chunk
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(name)s: %(message)s")
     create_app().run(host="0.0.0.0", port=8000)